@@ -1,11 +1,12 @@
+import asyncio
 from datetime import datetime, timedelta
 from typing import Annotated
 
 import bcrypt
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import select
+import jwt
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -15,24 +16,68 @@ from app.schemas import TokenData
 
 settings = get_settings()
 
-# OAuth2 scheme for token extraction
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+# JWT signing state resolved once at import time; going through the module-
+# level jwt.encode/decode would re-read settings and rebuild the algorithm
+# list on every request.
+_jwt = jwt.PyJWT()
+_JWT_KEY = settings.secret_key
+_JWT_ALGS = [settings.algorithm]
 
+# Hash verified on the unknown-email path so login takes the same time
+# whether or not the account exists (no timing oracle). Built with the same
+# cost factor as real hashes.
+_DUMMY_HASH = bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=settings.bcrypt_rounds))
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return bcrypt.checkpw(
+# Short-lived token -> User cache so repeated requests within the TTL skip
+# both the JWT decode and the users SELECT. Single-process only; entries are
+# dropped on logout/account deletion via the helpers below. No reverse
+# user -> tokens index: the cache itself is bounded (maxsize/TTL), while a
+# side index would outlive eviction and grow for the life of the process.
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _cache_user(token: str, user: User) -> None:
+    _user_cache[token] = user
+
+
+def invalidate_token(token: str | None) -> None:
+    """Drop a single token from the auth cache (used on logout)."""
+    if token:
+        _user_cache.pop(token, None)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached token for a user (used on account deletion).
+
+    Linear scan of the cache; it holds at most 10k entries and account
+    deletion is rare, so this beats maintaining a reverse index that
+    eviction would never prune.
+    """
+    for token in [t for t, u in _user_cache.items() if u.id == user_id]:
+        _user_cache.pop(token, None)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash.
+
+    bcrypt is CPU-bound (~hundreds of ms at the default cost), so run it in a
+    worker thread to keep the event loop free for other requests.
+    """
+    return await asyncio.to_thread(
+        bcrypt.checkpw,
         plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
+        hashed_password.encode('utf-8'),
     )
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return bcrypt.hashpw(
+async def get_password_hash(password: str) -> str:
+    """Hash a password in a worker thread (bcrypt is CPU-bound)."""
+    hashed = await asyncio.to_thread(
+        bcrypt.hashpw,
         password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+        bcrypt.gensalt(rounds=settings.bcrypt_rounds),
+    )
+    return hashed.decode('utf-8')
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -40,45 +85,85 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return _jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGS[0])
+
+
+# Login SELECT constructed once; only the email bind changes per call, so
+# the statement caches as a single compiled form.
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     """Get a user by email."""
-    result = await db.execute(select(User).where(User.email == email))
+    result = await db.execute(_USER_BY_EMAIL, {"email": email})
     return result.scalar_one_or_none()
 
 
 async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
-    """Get a user by ID."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    return result.scalar_one_or_none()
+    """Get a user by ID via the session's primary-key identity map."""
+    return await db.get(User, user_id)
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     """Authenticate a user by email and password."""
     user = await get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    if user is None:
+        # Burn the same bcrypt cost as a real verification so the response
+        # time does not reveal whether the email is registered.
+        await asyncio.to_thread(bcrypt.checkpw, password.encode('utf-8'), _DUMMY_HASH)
+        return None
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
 
-def get_token_from_cookie_or_header(request: Request, token: str | None = Depends(oauth2_scheme)) -> str | None:
-    """Extract token from cookie or Authorization header."""
+def get_token_from_request(request: Request) -> str | None:
+    """Extract the bearer token from the cookie or Authorization header.
+
+    Plain function rather than a Depends chain: called inline by the auth
+    dependencies so each request resolves one dependency, not three.
+    """
     # Try cookie first (for web UI)
-    cookie_token = request.cookies.get("access_token")
-    if cookie_token:
+    token = request.cookies.get("access_token")
+    if token:
         # Remove "Bearer " prefix if present
-        if cookie_token.startswith("Bearer "):
-            return cookie_token[7:]
-        return cookie_token
+        return token[7:] if token.startswith("Bearer ") else token
     # Fall back to header (for API)
-    return token
+    auth_header = request.headers.get("authorization")
+    if auth_header and auth_header[:7].lower() == "bearer ":
+        return auth_header[7:]
+    return None
+
+
+async def get_current_user_id(request: Request) -> int:
+    """Get the current user's id from the JWT without touching the database.
+
+    The signature already proves the token was issued to this user; routes
+    that only need the id (e.g. scoping entry queries) can skip the users
+    SELECT entirely. Use get_current_user when the full row is required.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    token = get_token_from_request(request)
+    if not token:
+        raise credentials_exception
+
+    try:
+        payload = _jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGS)
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise credentials_exception
+        return int(user_id)
+    except (jwt.InvalidTokenError, ValueError):
+        raise credentials_exception
 
 
 async def get_current_user(
     request: Request,
-    token: Annotated[str | None, Depends(get_token_from_cookie_or_header)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
     """Get the current authenticated user from JWT token."""
@@ -87,41 +172,57 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+    token = get_token_from_request(request)
     if not token:
         raise credentials_exception
-    
+
+    cached = _user_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = _jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGS)
         user_id: int | None = payload.get("sub")
         if user_id is None:
             raise credentials_exception
         token_data = TokenData(user_id=int(user_id))
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
     
     user = await get_user_by_id(db, token_data.user_id)
     if user is None:
         raise credentials_exception
-    
+
+    _cache_user(token, user)
     return user
 
 
-async def get_current_user_optional(
+async def get_current_user_id_optional(
     request: Request,
-    token: Annotated[str | None, Depends(get_token_from_cookie_or_header)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> User | None:
-    """Get the current user if authenticated, otherwise return None."""
+) -> int | None:
+    """Resolve the current user's id if authenticated, otherwise None.
+
+    The anonymous page routes only need to know whether the session is
+    valid, so this runs a single-column Core SELECT instead of hydrating a
+    full User object through the ORM.
+    """
+    token = get_token_from_request(request)
     if not token:
         return None
-    
+
+    cached = _user_cache.get(token)
+    if cached is not None:
+        return cached.id
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: int | None = payload.get("sub")
+        payload = _jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGS)
+        user_id = payload.get("sub")
         if user_id is None:
             return None
-        return await get_user_by_id(db, int(user_id))
-    except JWTError:
+        result = await db.execute(select(User.id).where(User.id == int(user_id)))
+        return result.scalar_one_or_none()
+    except (jwt.InvalidTokenError, ValueError):
         return None
 
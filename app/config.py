@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     secret_key: str = "dev-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440  # 24 hours
+    # Each +1 doubles hash time. Pick the largest value that keeps one hash
+    # in the ~250-400ms range on the deployment host (12 suits current
+    # commodity CPUs); stored hashes embed their cost, so changing this
+    # only affects new passwords.
+    bcrypt_rounds: int = 12
     
     # Database - supports SQLite (dev) or PostgreSQL (prod)
     database_url: str = "sqlite+aiosqlite:///./reflections.db"
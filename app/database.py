@@ -1,3 +1,5 @@
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -5,10 +7,39 @@ from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.debug,
-)
+if settings.async_database_url.startswith("sqlite"):
+    # SQLite is a local file; pool sizing is irrelevant and asyncpg-specific
+    # connect args don't apply.
+    engine = create_async_engine(
+        settings.async_database_url,
+        echo=settings.debug,
+        query_cache_size=1024,
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+        # WAL batches fsyncs and lets readers proceed during writes; the
+        # default rollback journal flushes to disk on every commit.
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+else:
+    engine = create_async_engine(
+        settings.async_database_url,
+        echo=settings.debug,
+        # Defaults (5 connections, no recycle) hit a ceiling under modest
+        # concurrency; size the pool explicitly and let asyncpg cache
+        # prepared statements for the repeated query shapes this app emits.
+        pool_size=20,
+        max_overflow=40,
+        pool_recycle=1800,
+        pool_pre_ping=False,
+        query_cache_size=1024,
+        connect_args={"prepared_statement_cache_size": 500},
+    )
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -21,6 +52,17 @@ class Base(DeclarativeBase):
     pass
 
 
+def dialect_insert(model):
+    """INSERT statement with ON CONFLICT support for the active dialect.
+
+    Both PostgreSQL and SQLite expose the same on_conflict_do_nothing /
+    on_conflict_do_update API, just from different dialect modules.
+    """
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 async def get_db():
     """Dependency for getting async database sessions."""
     async with async_session_maker() as session:
@@ -36,4 +78,10 @@ async def init_db():
     """Create all tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if engine.dialect.name == "postgresql":
+            # Login looks users up by exact email; a hash index answers that
+            # in O(1) without descending the unique btree.
+            await conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_users_email_hash ON users USING hash (email)")
+            )
 
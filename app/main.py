@@ -1,8 +1,11 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
 from app.config import get_settings
 from app.database import init_db
@@ -13,9 +16,19 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database and the hashing thread pool on startup."""
     await init_db()
+    # asyncio.to_thread (bcrypt hashing/verification in app.auth) runs on
+    # the loop's default executor; size it to the CPU count so concurrent
+    # logins hash in parallel instead of queueing. Starlette's sync-route
+    # threadpool is separate (anyio), so bcrypt never contends with it.
+    executor = ThreadPoolExecutor(
+        max_workers=os.cpu_count() or 4,
+        thread_name_prefix="hash",
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
     yield
+    executor.shutdown(wait=False)
 
 
 app = FastAPI(
@@ -23,14 +36,12 @@ app = FastAPI(
     description="Daily journaling with scores and reflections",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Templates
-templates = Jinja2Templates(directory="app/templates")
-
 # Include routers
 app.include_router(auth.router)
 app.include_router(entries.router)
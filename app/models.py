@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, UniqueConstraint, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -7,11 +7,14 @@ from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
-    
+    # Fetch server-generated defaults (created_at) in the INSERT's RETURNING
+    # clause instead of a follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship to day entries
     entries: Mapped[list["DayEntry"]] = relationship(
@@ -26,19 +29,24 @@ class User(Base):
 
 class DayEntry(Base):
     __tablename__ = "day_entries"
-    
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     date: Mapped[date] = mapped_column(Date, nullable=False)
     score: Mapped[int] = mapped_column(Integer, nullable=False)  # 0-10
     summary: Mapped[str] = mapped_column(String(200), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
     
     # Relationship to user
     user: Mapped["User"] = relationship("User", back_populates="entries")
     
-    # Ensure one entry per day per user
+    # One entry per day per user. The unique constraint is also the ON
+    # CONFLICT target for the upsert paths, and the composite index keeps
+    # the per-month range scans in calendar_page to an index lookup.
     __table_args__ = (
         UniqueConstraint("user_id", "date", name="uq_user_date"),
         Index("ix_user_date", "user_id", "date"),
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,11 +9,13 @@ from app.auth import (
     get_password_hash,
     authenticate_user,
     create_access_token,
-    get_user_by_email,
     get_current_user,
+    get_token_from_request,
+    invalidate_token,
+    invalidate_user,
 )
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, dialect_insert
 from app.models import User
 from app.schemas import UserCreate, UserResponse, Token
 
@@ -27,23 +29,25 @@ async def register(
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Register a new user account."""
-    # Check if email already exists
-    existing_user = await get_user_by_email(db, user_data.email)
-    if existing_user:
+    # Let the unique email index detect duplicates in the same round-trip
+    # as the insert (no SELECT-then-INSERT race).
+    stmt = (
+        dialect_insert(User)
+        .values(
+            email=user_data.email,
+            hashed_password=await get_password_hash(user_data.password),
+        )
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User)
+    )
+    user = (await db.execute(stmt)).scalar_one_or_none()
+
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    
-    # Create new user
-    user = User(
-        email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
-    )
-    db.add(user)
-    await db.flush()
-    await db.refresh(user)
-    
+
     return user
 
 
@@ -63,7 +67,7 @@ async def login(
         )
     
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": str(user.id), "email": user.email},
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
     )
     
@@ -81,8 +85,9 @@ async def login(
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
     """Logout and clear the access token cookie."""
+    invalidate_token(get_token_from_request(request))
     response.delete_cookie(key="access_token")
     return {"message": "Logged out successfully"}
 
@@ -102,6 +107,7 @@ async def delete_account(
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Delete the current user's account and all their data."""
+    invalidate_user(current_user.id)
     await db.delete(current_user)
     response.delete_cookie(key="access_token")
     return None
@@ -1,13 +1,15 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, and_
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, and_, delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user
-from app.database import get_db
-from app.models import User, DayEntry
+from app.auth import get_current_user_id
+from app.database import get_db, dialect_insert
+from app.models import DayEntry
 from app.schemas import (
     DayEntryCreate,
     DayEntryUpdate,
@@ -17,47 +19,102 @@ from app.schemas import (
 
 router = APIRouter(prefix="/api/entries", tags=["entries"])
 
+# Rendered list_entries bodies keyed by (user_id, query string). The short
+# TTL bounds staleness across processes; within this process any write to
+# the user's entries invalidates eagerly.
+_list_cache: TTLCache = TTLCache(maxsize=2_048, ttl=30)
+
+
+def invalidate_list_cache(user_id: int) -> None:
+    """Drop cached entry listings for a user (call after any entry write)."""
+    for key in [k for k in _list_cache if k[0] == user_id]:
+        _list_cache.pop(key, None)
+
 
 @router.get("", response_model=DayEntryListResponse)
 async def list_entries(
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
     start_date: date | None = Query(None, description="Filter entries from this date"),
     end_date: date | None = Query(None, description="Filter entries until this date"),
     min_score: int | None = Query(None, ge=0, le=10, description="Minimum score filter"),
     max_score: int | None = Query(None, ge=0, le=10, description="Maximum score filter"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum entries per page"),
+    offset: int = Query(0, ge=0, description="Entries to skip"),
 ):
-    """List all day entries for the current user with optional filters."""
-    query = select(DayEntry).where(DayEntry.user_id == current_user.id)
-    
+    """List day entries for the current user with optional filters, paginated."""
+    cache_key = (user_id, str(request.query_params))
+    cached_body = _list_cache.get(cache_key)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
+
+    conditions = [DayEntry.user_id == user_id]
+
     # Apply filters
     if start_date:
-        query = query.where(DayEntry.date >= start_date)
+        conditions.append(DayEntry.date >= start_date)
     if end_date:
-        query = query.where(DayEntry.date <= end_date)
+        conditions.append(DayEntry.date <= end_date)
     if min_score is not None:
-        query = query.where(DayEntry.score >= min_score)
+        conditions.append(DayEntry.score >= min_score)
     if max_score is not None:
-        query = query.where(DayEntry.score <= max_score)
-    
-    query = query.order_by(DayEntry.date.desc())
-    
+        conditions.append(DayEntry.score <= max_score)
+
+    query = (
+        select(DayEntry)
+        .where(*conditions)
+        .order_by(DayEntry.date.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
     result = await db.execute(query)
     entries = result.scalars().all()
-    
-    return DayEntryListResponse(entries=entries, total=len(entries))
+
+    # Total matching rows across all pages; skip the extra count query when
+    # the first page came back short.
+    if offset == 0 and len(entries) < limit:
+        total = len(entries)
+    else:
+        count_result = await db.execute(
+            select(func.count()).select_from(DayEntry).where(*conditions)
+        )
+        total = count_result.scalar_one()
+
+    # Serialize directly with orjson: the rows already satisfy the response
+    # shape, so re-validating every field through Pydantic is wasted work on
+    # what can be a large list.
+    response = ORJSONResponse(
+        {
+            "entries": [
+                {
+                    "id": e.id,
+                    "date": e.date,
+                    "score": e.score,
+                    "summary": e.summary,
+                    "created_at": e.created_at,
+                    "updated_at": e.updated_at,
+                }
+                for e in entries
+            ],
+            "total": total,
+        }
+    )
+    _list_cache[cache_key] = response.body
+    return response
 
 
 @router.get("/{entry_date}", response_model=DayEntryResponse)
 async def get_entry(
     entry_date: date,
-    current_user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Get a specific day entry by date."""
     result = await db.execute(
         select(DayEntry).where(
-            and_(DayEntry.user_id == current_user.id, DayEntry.date == entry_date)
+            and_(DayEntry.user_id == user_id, DayEntry.date == entry_date)
         )
     )
     entry = result.scalar_one_or_none()
@@ -74,32 +131,32 @@ async def get_entry(
 @router.post("", response_model=DayEntryResponse, status_code=status.HTTP_201_CREATED)
 async def create_entry(
     entry_data: DayEntryCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Create a new day entry."""
-    # Check if entry already exists for this date
-    existing = await db.execute(
-        select(DayEntry).where(
-            and_(DayEntry.user_id == current_user.id, DayEntry.date == entry_data.date)
+    # Let the uq_user_date constraint detect duplicates in the same
+    # round-trip as the insert (no SELECT-then-INSERT race).
+    stmt = (
+        dialect_insert(DayEntry)
+        .values(
+            user_id=user_id,
+            date=entry_data.date,
+            score=entry_data.score,
+            summary=entry_data.summary,
         )
+        .on_conflict_do_nothing(index_elements=["user_id", "date"])
+        .returning(DayEntry)
     )
-    if existing.scalar_one_or_none():
+    entry = (await db.execute(stmt)).scalar_one_or_none()
+
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Entry already exists for {entry_data.date}. Use PUT to update.",
         )
-    
-    entry = DayEntry(
-        user_id=current_user.id,
-        date=entry_data.date,
-        score=entry_data.score,
-        summary=entry_data.summary,
-    )
-    db.add(entry)
-    await db.flush()
-    await db.refresh(entry)
-    
+
+    invalidate_list_cache(user_id)
     return entry
 
 
@@ -107,55 +164,64 @@ async def create_entry(
 async def update_entry(
     entry_date: date,
     entry_data: DayEntryUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Update an existing day entry."""
-    result = await db.execute(
-        select(DayEntry).where(
-            and_(DayEntry.user_id == current_user.id, DayEntry.date == entry_date)
+    values = entry_data.model_dump(exclude_none=True)
+
+    if not values:
+        # Nothing to change; just return the current row (or 404).
+        result = await db.execute(
+            select(DayEntry).where(
+                and_(DayEntry.user_id == user_id, DayEntry.date == entry_date)
+            )
         )
-    )
-    entry = result.scalar_one_or_none()
-    
+        entry = result.scalar_one_or_none()
+    else:
+        # Single UPDATE ... RETURNING: the WHERE clause doubles as the
+        # existence check, so no separate SELECT round-trip.
+        stmt = (
+            update(DayEntry)
+            .where(and_(DayEntry.user_id == user_id, DayEntry.date == entry_date))
+            .values(**values)
+            .returning(DayEntry)
+            .execution_options(synchronize_session=False)
+        )
+        entry = (await db.execute(stmt)).scalar_one_or_none()
+
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No entry found for {entry_date}",
         )
-    
-    # Update fields if provided
-    if entry_data.score is not None:
-        entry.score = entry_data.score
-    if entry_data.summary is not None:
-        entry.summary = entry_data.summary
-    
-    await db.flush()
-    await db.refresh(entry)
-    
+
+    invalidate_list_cache(user_id)
     return entry
 
 
 @router.delete("/{entry_date}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_entry(
     entry_date: date,
-    current_user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Delete a day entry."""
-    result = await db.execute(
-        select(DayEntry).where(
-            and_(DayEntry.user_id == current_user.id, DayEntry.date == entry_date)
-        )
+    # Single DELETE ... RETURNING; a missing returned id means 404.
+    stmt = (
+        delete(DayEntry)
+        .where(and_(DayEntry.user_id == user_id, DayEntry.date == entry_date))
+        .returning(DayEntry.id)
+        .execution_options(synchronize_session=False)
     )
-    entry = result.scalar_one_or_none()
-    
-    if not entry:
+    deleted_id = (await db.execute(stmt)).scalar_one_or_none()
+
+    if deleted_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No entry found for {entry_date}",
         )
-    
-    await db.delete(entry)
+
+    invalidate_list_cache(user_id)
     return None
 
@@ -2,90 +2,121 @@ from datetime import date, timedelta
 from calendar import monthrange
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, and_
+from fastapi import APIRouter, Depends, Request, Form, HTTPException, Response, status
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row, select, and_, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import (
-    get_current_user_optional,
+    get_current_user_id_optional,
     get_current_user,
+    get_current_user_id,
     get_password_hash,
     authenticate_user,
     create_access_token,
     get_user_by_email,
+    get_token_from_request,
+    invalidate_token,
+    invalidate_user,
 )
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, dialect_insert
 from app.models import User, DayEntry
+from app.routers.entries import invalidate_list_cache
+from app.schemas import DayEntryCreate
+from app.templating import env, templates
 
 router = APIRouter(tags=["pages"])
-templates = Jinja2Templates(directory="app/templates")
 settings = get_settings()
 
+MONTH_NAMES = (
+    "", "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# The login/register pages render identically for every anonymous visitor
+# (no request-dependent output, error is None), so cache the HTML for the
+# process lifetime. Error responses still render dynamically.
+_static_page_cache: dict[str, str] = {}
+
+
+def _render_static_page(name: str) -> HTMLResponse:
+    html = _static_page_cache.get(name)
+    if html is None:
+        html = env.get_template(name).render({"error": None})
+        _static_page_cache[name] = html
+    return HTMLResponse(html)
+
+
+# CSS classes indexed by score (Chess.com style); scores are validated to
+# 0-10 upstream.
+_SCORE_CLASSES = (
+    "score-0",
+    "score-1", "score-2",
+    "score-3", "score-4",
+    "score-5",
+    "score-6", "score-7",
+    "score-8", "score-9",
+    "score-10",
+)
+
 
 def get_score_color(score: int | None) -> str:
-    """Get the CSS color class for a score (Chess.com style)."""
-    if score is None:
+    """Get the CSS color class for a score."""
+    if score is None or not 0 <= score <= 10:
         return "score-none"
-    colors = {
-        0: "score-0",
-        1: "score-1", 2: "score-2",
-        3: "score-3", 4: "score-4",
-        5: "score-5",
-        6: "score-6", 7: "score-7",
-        8: "score-8", 9: "score-9",
-        10: "score-10",
+    return _SCORE_CLASSES[score]
+
+
+def _today() -> date:
+    """Today's date as a dependency: computed once per request and shared
+    by every consumer in the handler instead of repeated date.today() calls."""
+    return date.today()
+
+
+def _make_day(current_date: date, entry: Row | None, today: date) -> dict:
+    """Build the template context for a single day cell."""
+    return {
+        "date": current_date,
+        "day": current_date.day,
+        "entry": entry,
+        "score_class": get_score_color(entry.score if entry else None),
+        "is_today": current_date == today,
+        "is_future": current_date > today,
     }
-    return colors.get(score, "score-none")
 
 
-def get_calendar_data(year: int, month: int, entries: dict[date, DayEntry]) -> list[list[dict]]:
+def get_calendar_data(
+    year: int, month: int, entries: dict[date, Row], today: date
+) -> list[list[dict]]:
     """Generate calendar grid data for a given month."""
     first_day = date(year, month, 1)
     days_in_month = monthrange(year, month)[1]
-    
+
     # Get the weekday of the first day (0=Monday, 6=Sunday)
     # We'll display Sunday-Saturday, so adjust
     start_weekday = (first_day.weekday() + 1) % 7  # Convert to Sunday=0
-    
-    weeks = []
-    current_week = [None] * start_weekday  # Pad the first week
-    
-    for day in range(1, days_in_month + 1):
-        current_date = date(year, month, day)
-        entry = entries.get(current_date)
-        
-        day_data = {
-            "date": current_date,
-            "day": day,
-            "entry": entry,
-            "score_class": get_score_color(entry.score if entry else None),
-            "is_today": current_date == date.today(),
-            "is_future": current_date > date.today(),
-        }
-        current_week.append(day_data)
-        
-        if len(current_week) == 7:
-            weeks.append(current_week)
-            current_week = []
-    
-    # Pad the last week if needed
-    if current_week:
-        current_week.extend([None] * (7 - len(current_week)))
-        weeks.append(current_week)
-    
-    return weeks
+
+    # Flat list of cells padded with None to whole weeks, then sliced into
+    # 7-wide rows.
+    cells: list[dict | None] = [None] * start_weekday
+    cells += [
+        _make_day(current_date, entries.get(current_date), today)
+        for current_date in (date(year, month, day) for day in range(1, days_in_month + 1))
+    ]
+    cells += [None] * (-len(cells) % 7)
+
+    return [cells[i:i + 7] for i in range(0, len(cells), 7)]
 
 
 @router.get("/", response_class=HTMLResponse)
 async def home(
     request: Request,
-    user: Annotated[User | None, Depends(get_current_user_optional)],
+    user_id: Annotated[int | None, Depends(get_current_user_id_optional)],
 ):
     """Home page - redirects to calendar if logged in, otherwise login."""
-    if user:
+    if user_id:
         return RedirectResponse(url="/calendar", status_code=status.HTTP_302_FOUND)
     return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
@@ -93,12 +124,12 @@ async def home(
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(
     request: Request,
-    user: Annotated[User | None, Depends(get_current_user_optional)],
+    user_id: Annotated[int | None, Depends(get_current_user_id_optional)],
 ):
     """Login page."""
-    if user:
+    if user_id:
         return RedirectResponse(url="/calendar", status_code=status.HTTP_302_FOUND)
-    return templates.TemplateResponse("login.html", {"request": request, "error": None})
+    return _render_static_page("login.html")
 
 
 @router.post("/login", response_class=HTMLResponse)
@@ -117,7 +148,7 @@ async def login_submit(
             status_code=status.HTTP_401_UNAUTHORIZED,
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
     response = RedirectResponse(url="/calendar", status_code=status.HTTP_302_FOUND)
     response.set_cookie(
         key="access_token",
@@ -133,12 +164,12 @@ async def login_submit(
 @router.get("/register", response_class=HTMLResponse)
 async def register_page(
     request: Request,
-    user: Annotated[User | None, Depends(get_current_user_optional)],
+    user_id: Annotated[int | None, Depends(get_current_user_id_optional)],
 ):
     """Registration page."""
-    if user:
+    if user_id:
         return RedirectResponse(url="/calendar", status_code=status.HTTP_302_FOUND)
-    return templates.TemplateResponse("register.html", {"request": request, "error": None})
+    return _render_static_page("register.html")
 
 
 @router.post("/register", response_class=HTMLResponse)
@@ -175,13 +206,12 @@ async def register_submit(
         )
     
     # Create user
-    user = User(email=email, hashed_password=get_password_hash(password))
+    user = User(email=email, hashed_password=await get_password_hash(password))
     db.add(user)
     await db.commit()
-    await db.refresh(user)
-    
+
     # Log them in
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
     response = RedirectResponse(url="/calendar", status_code=status.HTTP_302_FOUND)
     response.set_cookie(
         key="access_token",
@@ -195,8 +225,9 @@ async def register_submit(
 
 
 @router.get("/logout")
-async def logout():
+async def logout(request: Request):
     """Logout and redirect to login."""
+    invalidate_token(get_token_from_request(request))
     response = RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     response.delete_cookie(key="access_token")
     return response
@@ -205,13 +236,13 @@ async def logout():
 @router.get("/calendar", response_class=HTMLResponse)
 async def calendar_page(
     request: Request,
-    user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    today: Annotated[date, Depends(_today)],
     year: int | None = None,
     month: int | None = None,
 ):
     """Main calendar view."""
-    today = date.today()
     year = year or today.year
     month = month or today.month
     
@@ -225,47 +256,65 @@ async def calendar_page(
     first_day = date(year, month, 1)
     last_day = date(year, month, monthrange(year, month)[1])
     
+    # The template only reads score and summary, so select the columns
+    # directly instead of hydrating full ORM objects for the month.
+    # updated_at feeds the ETag below.
     result = await db.execute(
-        select(DayEntry).where(
+        select(DayEntry.date, DayEntry.score, DayEntry.summary, DayEntry.updated_at).where(
             and_(
-                DayEntry.user_id == user.id,
+                DayEntry.user_id == user_id,
                 DayEntry.date >= first_day,
                 DayEntry.date <= last_day,
             )
         )
     )
-    entries_list = result.scalars().all()
-    entries = {e.date: e for e in entries_list}
+    entries = {row.date: row for row in result.all()}
+
+    # The page only changes when the month's entries change or the date
+    # rolls over (is_today/is_future flags); a matching ETag skips the
+    # whole render on browser refresh.
+    last_updated = max((row.updated_at for row in entries.values()), default=None)
+    # user_id is part of the tag so a validator cached by a previous account
+    # in the same browser can never 304 against another user's page.
+    etag = (
+        f'W/"{user_id}-{year}{month:02}-{len(entries)}'
+        f'-{int(last_updated.timestamp()) if last_updated else 0}-{today.toordinal()}"'
+    )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     
     # Generate calendar data
-    weeks = get_calendar_data(year, month, entries)
-    
-    # Navigation
-    prev_month = month - 1 if month > 1 else 12
-    prev_year = year if month > 1 else year - 1
-    next_month = month + 1 if month < 12 else 1
-    next_year = year if month < 12 else year + 1
-    
-    month_names = [
-        "", "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"
-    ]
+    weeks = get_calendar_data(year, month, entries, today)
     
-    return templates.TemplateResponse(
-        "calendar.html",
-        {
-            "request": request,
-            "user": user,
-            "weeks": weeks,
-            "year": year,
-            "month": month,
-            "month_name": month_names[month],
-            "prev_month": prev_month,
-            "prev_year": prev_year,
-            "next_month": next_month,
-            "next_year": next_year,
-            "today": today,
-        },
+    # Navigation: branchless wrap-around arithmetic (bool is 0/1).
+    prev_month = (month - 2) % 12 + 1
+    prev_year = year - (month == 1)
+    next_month = month % 12 + 1
+    next_year = year + (month == 12)
+
+    # Stream the render so the first weeks hit the socket while the rest
+    # of the page is still being generated (the day cells already carry
+    # precomputed is_today/is_future booleans, so the loop body is cheap).
+    return StreamingResponse(
+        env.get_template("calendar.html").generate(
+            {
+                "request": request,
+                # base.html only tests truthiness here to decide whether to
+                # show the nav; no attribute access, so the id suffices.
+                "user": user_id,
+                "weeks": weeks,
+                "year": year,
+                "month": month,
+                "month_name": MONTH_NAMES[month],
+                "prev_month": prev_month,
+                "prev_year": prev_year,
+                "next_month": next_month,
+                "next_year": next_year,
+                "today": today,
+            }
+        ),
+        media_type="text/html",
+        headers={"ETag": etag, "Cache-Control": "private, must-revalidate"},
     )
 
 
@@ -273,27 +322,35 @@ async def calendar_page(
 async def get_day_modal(
     request: Request,
     entry_date: date,
-    user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    today: Annotated[date, Depends(_today)],
 ):
     """Get the day entry modal content (HTMX partial)."""
     result = await db.execute(
         select(DayEntry).where(
-            and_(DayEntry.user_id == user.id, DayEntry.date == entry_date)
+            and_(DayEntry.user_id == user_id, DayEntry.date == entry_date)
         )
     )
     entry = result.scalar_one_or_none()
-    
-    is_future = entry_date > date.today()
-    
+
+    # Scoped to user_id for the same cross-account reason as calendar_page.
+    etag = (
+        f'W/"{user_id}-{int(entry.updated_at.timestamp()) if entry else 0}'
+        f'-{today.toordinal()}"'
+    )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
     return templates.TemplateResponse(
         "components/entry_form.html",
         {
             "request": request,
             "entry": entry,
             "entry_date": entry_date,
-            "is_future": is_future,
+            "is_future": entry_date > today,
         },
+        headers={"ETag": etag, "Cache-Control": "private, must-revalidate"},
     )
 
 
@@ -301,62 +358,57 @@ async def get_day_modal(
 async def save_day_entry(
     request: Request,
     entry_date: date,
-    user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    today: Annotated[date, Depends(_today)],
     score: int = Form(...),
     summary: str = Form(...),
 ):
     """Save or update a day entry (HTMX)."""
-    # Validate
-    if score < 0 or score > 10:
-        return templates.TemplateResponse(
-            "components/entry_form.html",
-            {
-                "request": request,
-                "entry": None,
-                "entry_date": entry_date,
-                "error": "Score must be between 0 and 10",
-                "is_future": entry_date > date.today(),
-            },
-            status_code=status.HTTP_400_BAD_REQUEST,
+    # Validate through the same schema the JSON API uses (pydantic-core
+    # handles the stripping and bounds checks).
+    try:
+        data = DayEntryCreate(date=entry_date, score=score, summary=summary)
+    except ValidationError as exc:
+        field = exc.errors()[0]["loc"][0]
+        error = (
+            "Score must be between 0 and 10"
+            if field == "score"
+            else "Summary must be 1-200 characters"
         )
-    
-    if len(summary.strip()) == 0 or len(summary) > 200:
         return templates.TemplateResponse(
             "components/entry_form.html",
             {
                 "request": request,
                 "entry": None,
                 "entry_date": entry_date,
-                "error": "Summary must be 1-200 characters",
-                "is_future": entry_date > date.today(),
+                "error": error,
+                "is_future": entry_date > today,
             },
             status_code=status.HTTP_400_BAD_REQUEST,
         )
-    
-    # Check if entry exists
-    result = await db.execute(
-        select(DayEntry).where(
-            and_(DayEntry.user_id == user.id, DayEntry.date == entry_date)
-        )
-    )
-    entry = result.scalar_one_or_none()
-    
-    if entry:
-        entry.score = score
-        entry.summary = summary.strip()
-    else:
-        entry = DayEntry(
-            user_id=user.id,
+    summary = data.summary
+
+    # Single upsert: INSERT ... ON CONFLICT (user_id, date) DO UPDATE
+    # RETURNING replaces the SELECT/branch/flush/refresh sequence and is
+    # atomic under concurrent saves for the same day.
+    stmt = (
+        dialect_insert(DayEntry)
+        .values(
+            user_id=user_id,
             date=entry_date,
             score=score,
-            summary=summary.strip(),
+            summary=summary,
         )
-        db.add(entry)
-    
-    await db.flush()
-    await db.refresh(entry)
-    
+        .on_conflict_do_update(
+            index_elements=["user_id", "date"],
+            set_={"score": score, "summary": summary, "updated_at": func.now()},
+        )
+        .returning(DayEntry)
+    )
+    entry = (await db.execute(stmt)).scalar_one()
+    invalidate_list_cache(user_id)
+
     # Return updated day cell for the calendar
     return templates.TemplateResponse(
         "components/day_cell.html",
@@ -367,7 +419,7 @@ async def save_day_entry(
                 "day": entry_date.day,
                 "entry": entry,
                 "score_class": get_score_color(entry.score),
-                "is_today": entry_date == date.today(),
+                "is_today": entry_date == today,
                 "is_future": False,
             },
             "success": True,
@@ -380,20 +432,21 @@ async def save_day_entry(
 async def delete_day_entry(
     request: Request,
     entry_date: date,
-    user: Annotated[User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    today: Annotated[date, Depends(_today)],
 ):
     """Delete a day entry (HTMX)."""
+    # Direct DELETE: no need to hydrate the row just to hand it back to
+    # db.delete(), and the empty cell is returned regardless.
     result = await db.execute(
-        select(DayEntry).where(
-            and_(DayEntry.user_id == user.id, DayEntry.date == entry_date)
-        )
+        delete(DayEntry)
+        .where(and_(DayEntry.user_id == user_id, DayEntry.date == entry_date))
+        .execution_options(synchronize_session=False)
     )
-    entry = result.scalar_one_or_none()
-    
-    if entry:
-        await db.delete(entry)
-    
+    if result.rowcount:
+        invalidate_list_cache(user_id)
+
     # Return empty day cell
     return templates.TemplateResponse(
         "components/day_cell.html",
@@ -404,8 +457,8 @@ async def delete_day_entry(
                 "day": entry_date.day,
                 "entry": None,
                 "score_class": "score-none",
-                "is_today": entry_date == date.today(),
-                "is_future": entry_date > date.today(),
+                "is_today": entry_date == today,
+                "is_future": entry_date > today,
             },
         },
         headers={"HX-Trigger": "closeModal"},
@@ -431,6 +484,7 @@ async def delete_account_page(
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """Delete account from settings page."""
+    invalidate_user(user.id)
     await db.delete(user)
     response = RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     response.delete_cookie(key="access_token")
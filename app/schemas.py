@@ -1,5 +1,24 @@
 from datetime import date, datetime
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints
+
+# Strip/length handling in pydantic-core (Rust) instead of a Python
+# field_validator call per summary.
+SummaryStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=200)]
+
+# Login only needs to match an address against what registration already
+# validated, so a cheap shape check beats EmailStr's full RFC parse
+# (email-validator) on the hot path. Registration keeps EmailStr.
+EmailLite = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        to_lower=True,
+        max_length=254,
+        pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$",
+    ),
+]
 
 
 # ============ Auth Schemas ============
@@ -10,17 +29,16 @@ class UserCreate(BaseModel):
 
 
 class UserLogin(BaseModel):
-    email: EmailStr
+    email: EmailLite
     password: str
 
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     email: str
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
 class Token(BaseModel):
@@ -37,34 +55,23 @@ class TokenData(BaseModel):
 class DayEntryCreate(BaseModel):
     date: date
     score: int = Field(..., ge=0, le=10, description="Score from 0 (blunder) to 10 (brilliant)")
-    summary: str = Field(..., min_length=1, max_length=200)
-    
-    @field_validator("summary")
-    @classmethod
-    def strip_summary(cls, v: str) -> str:
-        return v.strip()
+    summary: SummaryStr
 
 
 class DayEntryUpdate(BaseModel):
     score: int | None = Field(None, ge=0, le=10)
-    summary: str | None = Field(None, min_length=1, max_length=200)
-    
-    @field_validator("summary")
-    @classmethod
-    def strip_summary(cls, v: str | None) -> str | None:
-        return v.strip() if v else v
+    summary: SummaryStr | None = None
 
 
 class DayEntryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     date: date
     score: int
     summary: str
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
 class DayEntryListResponse(BaseModel):
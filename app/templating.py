@@ -0,0 +1,40 @@
+"""Shared Jinja2 environment for page rendering.
+
+Every template is parsed and compiled once at import time (and cached as
+bytecode on disk), so request handlers pay only a dict lookup plus the
+render itself instead of compile-on-first-use.
+"""
+import tempfile
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_BYTECODE_DIR = Path(tempfile.gettempdir()) / "reflections_jinja_cache"
+_BYTECODE_DIR.mkdir(exist_ok=True)
+
+env = Environment(
+    loader=FileSystemLoader("app/templates"),
+    autoescape=True,
+    # auto_reload stats every template file per render; only useful in dev.
+    auto_reload=settings.debug,
+    bytecode_cache=FileSystemBytecodeCache(str(_BYTECODE_DIR)),
+    cache_size=400,
+)
+
+templates = Jinja2Templates(env=env)
+
+# Compile everything at process start, not under the first request.
+for _name in (
+    "login.html",
+    "register.html",
+    "calendar.html",
+    "settings.html",
+    "components/entry_form.html",
+    "components/day_cell.html",
+):
+    env.get_template(_name)